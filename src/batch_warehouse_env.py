@@ -0,0 +1,347 @@
+"""
+Batched Hazardous Warehouse Environment.
+
+A structure-of-arrays NumPy port of HazardousWarehouseEnv that steps N
+independent episodes at once. All per-step work is vectorized boolean and
+index arithmetic; there is no per-environment Python loop after reset.
+
+Layouts and dynamics match the scalar environment exactly: an environment
+seeded with s here produces the same hazard placement as
+HazardousWarehouseEnv(seed=s).
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from hazardous_warehouse_env import Action, Percept
+
+try:
+    from numba import njit, prange
+
+    _HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    _HAVE_NUMBA = False
+    prange = range
+
+# Direction encoding: index into these tables. Order matches turning
+# rightwards, so TURN_RIGHT is +1 mod 4 and TURN_LEFT is +3 mod 4.
+DX = np.array([0, 1, 0, -1], dtype=np.int8)  # NORTH, EAST, SOUTH, WEST
+DY = np.array([1, 0, -1, 0], dtype=np.int8)
+EAST = 1
+
+# Plain-int action codes so the compiled kernel can branch on them.
+_FORWARD = Action.FORWARD.value
+_TURN_LEFT = Action.TURN_LEFT.value
+_TURN_RIGHT = Action.TURN_RIGHT.value
+_GRAB = Action.GRAB.value
+_SHUTDOWN = Action.SHUTDOWN.value
+_EXIT = Action.EXIT.value
+
+
+def _py_step_kernel(robot_x, robot_y, dir_idx, alive, has_package,
+                    has_shutdown, terminated, success, damaged,
+                    forklift_x, forklift_y, forklift_alive,
+                    package_x, package_y, steps, total_reward,
+                    actions, width, height, dx_table, dy_table,
+                    rewards, bump, beep, creaking, rumbling, beacon):
+    """Per-environment step loop; compiled with numba when available."""
+    n = robot_x.shape[0]
+    for i in prange(n):
+        action = actions[i]
+        active = not terminated[i]
+        reward = -1.0 if active else 0.0
+
+        if active and action == _FORWARD:
+            dx = dx_table[dir_idx[i]]
+            dy = dy_table[dir_idx[i]]
+            new_x = robot_x[i] + dx
+            new_y = robot_y[i] + dy
+            if new_x < 1 or new_x > width or new_y < 1 or new_y > height:
+                bump[i] = True
+            else:
+                robot_x[i] = new_x
+                robot_y[i] = new_y
+                hit_forklift = (
+                    forklift_alive[i]
+                    and new_x == forklift_x[i]
+                    and new_y == forklift_y[i]
+                )
+                if damaged[i, new_x, new_y] or hit_forklift:
+                    alive[i] = False
+                    terminated[i] = True
+                    reward = -1000.0
+
+        elif active and action == _TURN_LEFT:
+            dir_idx[i] = (dir_idx[i] + 3) % 4
+
+        elif active and action == _TURN_RIGHT:
+            dir_idx[i] = (dir_idx[i] + 1) % 4
+
+        elif active and action == _GRAB:
+            if (
+                not has_package[i]
+                and robot_x[i] == package_x[i]
+                and robot_y[i] == package_y[i]
+            ):
+                has_package[i] = True
+
+        elif active and action == _SHUTDOWN and has_shutdown[i]:
+            has_shutdown[i] = False
+            reward -= 9.0
+            if forklift_alive[i]:
+                dx = dx_table[dir_idx[i]]
+                dy = dy_table[dir_idx[i]]
+                x = robot_x[i] + dx
+                y = robot_y[i] + dy
+                while 1 <= x <= width and 1 <= y <= height:
+                    if x == forklift_x[i] and y == forklift_y[i]:
+                        forklift_alive[i] = False
+                        beep[i] = True
+                        break
+                    x += dx
+                    y += dy
+
+        elif active and action == _EXIT:
+            if robot_x[i] == 1 and robot_y[i] == 1:
+                terminated[i] = True
+                if has_package[i]:
+                    success[i] = True
+                    reward = 1000.0
+
+        if active:
+            steps[i] += 1
+        rewards[i] = reward
+        total_reward[i] += reward
+
+        x = robot_x[i]
+        y = robot_y[i]
+        creaking[i] = alive[i] and (
+            damaged[i, x - 1, y]
+            or damaged[i, x + 1, y]
+            or damaged[i, x, y - 1]
+            or damaged[i, x, y + 1]
+        )
+        rumbling[i] = (
+            alive[i]
+            and forklift_alive[i]
+            and abs(forklift_x[i] - x) + abs(forklift_y[i] - y) == 1
+        )
+        beacon[i] = (
+            alive[i]
+            and not has_package[i]
+            and x == package_x[i]
+            and y == package_y[i]
+        )
+
+
+if _HAVE_NUMBA:
+    _step_kernel = njit(parallel=True, cache=True)(_py_step_kernel)
+else:
+    _step_kernel = _py_step_kernel
+
+
+class BatchHazardousWarehouseEnv:
+    """
+    N hazardous warehouses stepped in lockstep.
+
+    Actions are passed as an int array of `Action.value`s. Percepts come
+    back as a Percept namedtuple whose fields are boolean arrays of shape
+    (N,), alongside a float32 reward array and a bool terminated array.
+    """
+
+    def __init__(self, num_envs: int, width: int = 4, height: int = 4,
+                 num_damaged: int = 2, seed: int | None = None) -> None:
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.num_damaged = num_damaged
+        self.seed = seed
+        self.reset(seed)
+
+    def reset(self, seed: int | None = None) -> Percept:
+        n, w, h = self.num_envs, self.width, self.height
+        if seed is not None:
+            self.seed = seed
+
+        # Hazard grids are padded by one cell on each side so adjacency
+        # reads never need a bounds check; coordinates stay 1-based.
+        self.damaged = np.zeros((n, w + 2, h + 2), dtype=bool)
+        self.forklift_x = np.zeros(n, dtype=np.int8)
+        self.forklift_y = np.zeros(n, dtype=np.int8)
+        self.forklift_alive = np.ones(n, dtype=bool)
+        self.package_x = np.zeros(n, dtype=np.int8)
+        self.package_y = np.zeros(n, dtype=np.int8)
+
+        all_positions = [
+            (x, y) for x in range(1, w + 1) for y in range(1, h + 1) if (x, y) != (1, 1)
+        ]
+        for i in range(n):
+            rng = random.Random(None if self.seed is None else self.seed + i)
+            positions = all_positions.copy()
+            rng.shuffle(positions)
+            for dx_, dy_ in positions[: self.num_damaged]:
+                self.damaged[i, dx_, dy_] = True
+            self.forklift_x[i], self.forklift_y[i] = positions[self.num_damaged]
+            self.package_x[i], self.package_y[i] = positions[self.num_damaged + 1]
+
+        self.robot_x = np.ones(n, dtype=np.int8)
+        self.robot_y = np.ones(n, dtype=np.int8)
+        self.dir_idx = np.full(n, EAST, dtype=np.int8)
+        self.has_package = np.zeros(n, dtype=bool)
+        self.has_shutdown_device = np.ones(n, dtype=bool)
+        self.alive = np.ones(n, dtype=bool)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.success = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.total_reward = np.zeros(n, dtype=np.float32)
+
+        no = np.zeros(n, dtype=bool)
+        return self._get_percepts(bump=no, beep=no)
+
+    def step_batch(self, actions: np.ndarray) -> tuple[Percept, np.ndarray, np.ndarray]:
+        if not _HAVE_NUMBA:
+            return self._step_numpy(actions)
+
+        n = self.num_envs
+        rewards = np.zeros(n, dtype=np.float32)
+        bump = np.zeros(n, dtype=bool)
+        beep = np.zeros(n, dtype=bool)
+        creaking = np.zeros(n, dtype=bool)
+        rumbling = np.zeros(n, dtype=bool)
+        beacon = np.zeros(n, dtype=bool)
+
+        _step_kernel(
+            self.robot_x, self.robot_y, self.dir_idx, self.alive,
+            self.has_package, self.has_shutdown_device, self.terminated,
+            self.success, self.damaged, self.forklift_x, self.forklift_y,
+            self.forklift_alive, self.package_x, self.package_y, self.steps,
+            self.total_reward, np.asarray(actions, dtype=np.int64),
+            self.width, self.height, DX, DY,
+            rewards, bump, beep, creaking, rumbling, beacon,
+        )
+
+        percept = Percept(
+            creaking=creaking, rumbling=rumbling, beacon=beacon, bump=bump, beep=beep
+        )
+        return percept, rewards, self.terminated.copy()
+
+    def _step_numpy(self, actions: np.ndarray) -> tuple[Percept, np.ndarray, np.ndarray]:
+        n = self.num_envs
+        envs = np.arange(n)
+        active = ~self.terminated
+
+        reward = np.where(active, np.float32(-1.0), np.float32(0.0))
+        bump = np.zeros(n, dtype=bool)
+        beep = np.zeros(n, dtype=bool)
+
+        # FORWARD: move, bump on walls, die on hazards.
+        forward = active & (actions == Action.FORWARD.value)
+        new_x = self.robot_x + DX[self.dir_idx]
+        new_y = self.robot_y + DY[self.dir_idx]
+        in_bounds = (new_x >= 1) & (new_x <= self.width) & (new_y >= 1) & (new_y <= self.height)
+        bump |= forward & ~in_bounds
+        moved = forward & in_bounds
+        self.robot_x = np.where(moved, new_x, self.robot_x)
+        self.robot_y = np.where(moved, new_y, self.robot_y)
+
+        on_damaged = self.damaged[envs, self.robot_x, self.robot_y]
+        on_forklift = (
+            self.forklift_alive
+            & (self.robot_x == self.forklift_x)
+            & (self.robot_y == self.forklift_y)
+        )
+        died = moved & (on_damaged | on_forklift)
+        self.alive &= ~died
+        self.terminated |= died
+        reward = np.where(died, np.float32(-1000.0), reward)
+
+        # Turns are +/-1 on the direction index.
+        self.dir_idx = np.where(
+            active & (actions == Action.TURN_LEFT.value), (self.dir_idx + 3) % 4, self.dir_idx
+        ).astype(np.int8)
+        self.dir_idx = np.where(
+            active & (actions == Action.TURN_RIGHT.value), (self.dir_idx + 1) % 4, self.dir_idx
+        ).astype(np.int8)
+
+        # GRAB picks up the package when standing on it.
+        grab = active & (actions == Action.GRAB.value)
+        grabbed = (
+            grab
+            & ~self.has_package
+            & (self.robot_x == self.package_x)
+            & (self.robot_y == self.package_y)
+        )
+        self.has_package |= grabbed
+
+        # SHUTDOWN fires a ray along the facing direction.
+        shutdown = active & (actions == Action.SHUTDOWN.value) & self.has_shutdown_device
+        reward = np.where(shutdown, reward - np.float32(9.0), reward)
+        self.has_shutdown_device &= ~shutdown
+        fdx = self.forklift_x - self.robot_x
+        fdy = self.forklift_y - self.robot_y
+        in_ray = (
+            ((DX[self.dir_idx] != 0) & (fdy == 0) & (fdx * DX[self.dir_idx] > 0))
+            | ((DY[self.dir_idx] != 0) & (fdx == 0) & (fdy * DY[self.dir_idx] > 0))
+        )
+        beep |= shutdown & self.forklift_alive & in_ray
+        self.forklift_alive &= ~beep
+
+        # EXIT only succeeds at the start cell; with the package it pays out.
+        exiting = active & (actions == Action.EXIT.value) & (self.robot_x == 1) & (self.robot_y == 1)
+        self.terminated |= exiting
+        won = exiting & self.has_package
+        self.success |= won
+        reward = np.where(won, np.float32(1000.0), reward)
+
+        self.steps += active
+        self.total_reward += reward
+
+        return self._get_percepts(bump=bump, beep=beep), reward, self.terminated.copy()
+
+    def _get_percepts(self, bump: np.ndarray, beep: np.ndarray) -> Percept:
+        envs = np.arange(self.num_envs)
+        x, y = self.robot_x, self.robot_y
+
+        creaking = (
+            self.damaged[envs, x - 1, y]
+            | self.damaged[envs, x + 1, y]
+            | self.damaged[envs, x, y - 1]
+            | self.damaged[envs, x, y + 1]
+        )
+        rumbling = self.forklift_alive & (
+            np.abs(self.forklift_x - x) + np.abs(self.forklift_y - y) == 1
+        )
+        beacon = ~self.has_package & (x == self.package_x) & (y == self.package_y)
+
+        return Percept(
+            creaking=creaking & self.alive,
+            rumbling=rumbling & self.alive,
+            beacon=beacon & self.alive,
+            bump=bump,
+            beep=beep,
+        )
+
+
+if __name__ == "__main__":
+    from hazardous_warehouse_env import HazardousWarehouseEnv
+
+    batch = BatchHazardousWarehouseEnv(num_envs=4, seed=42)
+    scalar = HazardousWarehouseEnv(seed=42)
+
+    actions = [Action.FORWARD, Action.TURN_LEFT, Action.FORWARD]
+    for action in actions:
+        batch_percept, batch_reward, _ = batch.step_batch(
+            np.full(batch.num_envs, action.value)
+        )
+        scalar_percept, scalar_reward, _, _ = scalar.step(action)
+        print(f"{action.name}: batch env 0 reward {batch_reward[0]}, scalar {scalar_reward}")
+        assert batch_reward[0] == scalar_reward
+        assert all(
+            bool(getattr(batch_percept, f)[0]) == getattr(scalar_percept, f)
+            for f in Percept._fields
+        )
+
+    print("Batch env 0 matches the scalar environment.")
@@ -0,0 +1,292 @@
+"""
+GPU-Batched Hazardous Warehouse Environment (experimental).
+
+A numba.cuda port of BatchHazardousWarehouseEnv in the WarpDrive style:
+one CUDA thread per environment, with all state held in device arrays.
+The grid is tiny, so each thread's working set fits in registers.
+
+Unlike the CPU batch environment, episodes auto-reset on termination
+inside the kernel, resampling a fresh layout from the device-side RNG;
+layouts therefore do not reproduce the scalar environment's seeding.
+Only worth the transfer overhead for very large batches (N >~ 10^4).
+
+Requires a CUDA-capable GPU; construction raises RuntimeError otherwise.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from hazardous_warehouse_env import Action, Percept
+
+try:
+    from numba import cuda
+    from numba.cuda.random import (
+        create_xoroshiro128p_states,
+        xoroshiro128p_next,
+    )
+
+    _HAVE_CUDA_MODULE = True
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    _HAVE_CUDA_MODULE = False
+
+_FORWARD = Action.FORWARD.value
+_TURN_LEFT = Action.TURN_LEFT.value
+_TURN_RIGHT = Action.TURN_RIGHT.value
+_GRAB = Action.GRAB.value
+_SHUTDOWN = Action.SHUTDOWN.value
+_EXIT = Action.EXIT.value
+
+_THREADS_PER_BLOCK = 64
+
+
+def gpu_available() -> bool:
+    return _HAVE_CUDA_MODULE and cuda.is_available()
+
+
+if _HAVE_CUDA_MODULE:
+
+    @cuda.jit(device=True)
+    def _rand_cell(rng_states, tid, width, height):
+        """Uniform random cell excluding the (1, 1) start cell."""
+        n_cells = width * height - 1
+        r = xoroshiro128p_next(rng_states, tid) % np.uint64(n_cells)
+        # Cells are numbered 1..W*H-1 row-major, skipping index 0 == (1, 1).
+        idx = np.int32(r) + 1
+        x = idx // height + 1
+        y = idx % height + 1
+        return x, y
+
+    @cuda.jit(device=True)
+    def _reset_env(rng_states, tid, width, height, num_damaged,
+                   robot_x, robot_y, dir_idx, alive, has_package,
+                   has_shutdown, terminated, success, damaged,
+                   forklift_x, forklift_y, forklift_alive,
+                   package_x, package_y):
+        for x in range(width + 2):
+            for y in range(height + 2):
+                damaged[tid, x, y] = False
+
+        placed = 0
+        while placed < num_damaged:
+            x, y = _rand_cell(rng_states, tid, width, height)
+            if not damaged[tid, x, y]:
+                damaged[tid, x, y] = True
+                placed += 1
+
+        while True:
+            x, y = _rand_cell(rng_states, tid, width, height)
+            if not damaged[tid, x, y]:
+                forklift_x[tid] = x
+                forklift_y[tid] = y
+                break
+
+        while True:
+            x, y = _rand_cell(rng_states, tid, width, height)
+            if not damaged[tid, x, y] and not (x == forklift_x[tid] and y == forklift_y[tid]):
+                package_x[tid] = x
+                package_y[tid] = y
+                break
+
+        robot_x[tid] = 1
+        robot_y[tid] = 1
+        dir_idx[tid] = 1  # EAST
+        alive[tid] = True
+        has_package[tid] = False
+        has_shutdown[tid] = True
+        forklift_alive[tid] = True
+        terminated[tid] = False
+        success[tid] = False
+
+    @cuda.jit
+    def _step_gpu(rng_states, width, height, num_damaged,
+                  robot_x, robot_y, dir_idx, alive, has_package,
+                  has_shutdown, terminated, success, damaged,
+                  forklift_x, forklift_y, forklift_alive,
+                  package_x, package_y, steps, total_reward,
+                  actions, rewards, bump, beep, creaking, rumbling, beacon):
+        tid = cuda.grid(1)
+        if tid >= robot_x.shape[0]:
+            return
+
+        # WarpDrive-style auto-reset: a terminated episode restarts with a
+        # freshly sampled layout before this step executes.
+        if terminated[tid]:
+            _reset_env(rng_states, tid, width, height, num_damaged,
+                       robot_x, robot_y, dir_idx, alive, has_package,
+                       has_shutdown, terminated, success, damaged,
+                       forklift_x, forklift_y, forklift_alive,
+                       package_x, package_y)
+
+        action = actions[tid]
+        reward = -1.0
+        bump[tid] = False
+        beep[tid] = False
+
+        d = dir_idx[tid]
+        if d == 0:
+            dx, dy = 0, 1
+        elif d == 1:
+            dx, dy = 1, 0
+        elif d == 2:
+            dx, dy = 0, -1
+        else:
+            dx, dy = -1, 0
+
+        if action == _FORWARD:
+            new_x = robot_x[tid] + dx
+            new_y = robot_y[tid] + dy
+            if new_x < 1 or new_x > width or new_y < 1 or new_y > height:
+                bump[tid] = True
+            else:
+                robot_x[tid] = new_x
+                robot_y[tid] = new_y
+                hit_forklift = (
+                    forklift_alive[tid]
+                    and new_x == forklift_x[tid]
+                    and new_y == forklift_y[tid]
+                )
+                if damaged[tid, new_x, new_y] or hit_forklift:
+                    alive[tid] = False
+                    terminated[tid] = True
+                    reward = -1000.0
+
+        elif action == _TURN_LEFT:
+            dir_idx[tid] = (d + 3) % 4
+
+        elif action == _TURN_RIGHT:
+            dir_idx[tid] = (d + 1) % 4
+
+        elif action == _GRAB:
+            if (
+                not has_package[tid]
+                and robot_x[tid] == package_x[tid]
+                and robot_y[tid] == package_y[tid]
+            ):
+                has_package[tid] = True
+
+        elif action == _SHUTDOWN and has_shutdown[tid]:
+            has_shutdown[tid] = False
+            reward -= 9.0
+            if forklift_alive[tid]:
+                x = robot_x[tid] + dx
+                y = robot_y[tid] + dy
+                while 1 <= x <= width and 1 <= y <= height:
+                    if x == forklift_x[tid] and y == forklift_y[tid]:
+                        forklift_alive[tid] = False
+                        beep[tid] = True
+                        break
+                    x += dx
+                    y += dy
+
+        elif action == _EXIT:
+            if robot_x[tid] == 1 and robot_y[tid] == 1:
+                terminated[tid] = True
+                if has_package[tid]:
+                    success[tid] = True
+                    reward = 1000.0
+
+        steps[tid] += 1
+        rewards[tid] = reward
+        total_reward[tid] += reward
+
+        x = robot_x[tid]
+        y = robot_y[tid]
+        creaking[tid] = alive[tid] and (
+            damaged[tid, x - 1, y]
+            or damaged[tid, x + 1, y]
+            or damaged[tid, x, y - 1]
+            or damaged[tid, x, y + 1]
+        )
+        rumbling[tid] = (
+            alive[tid]
+            and forklift_alive[tid]
+            and abs(forklift_x[tid] - x) + abs(forklift_y[tid] - y) == 1
+        )
+        beacon[tid] = (
+            alive[tid]
+            and not has_package[tid]
+            and x == package_x[tid]
+            and y == package_y[tid]
+        )
+
+
+class GpuBatchHazardousWarehouseEnv:
+    """
+    N hazardous warehouses stepped in lockstep on the GPU.
+
+    State lives in device arrays between calls; step_batch uploads only
+    the action array and downloads only the percept/reward/done arrays.
+    """
+
+    def __init__(self, num_envs: int, width: int = 4, height: int = 4,
+                 num_damaged: int = 2, seed: int = 0) -> None:
+        if not gpu_available():
+            raise RuntimeError(
+                "GpuBatchHazardousWarehouseEnv requires numba with a CUDA-capable GPU"
+            )
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.num_damaged = num_damaged
+
+        n = num_envs
+        self._rng_states = create_xoroshiro128p_states(n, seed=seed)
+        self.robot_x = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.robot_y = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.dir_idx = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.alive = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self.has_package = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self.has_shutdown_device = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        # Start terminated so the first step_batch auto-resets every env.
+        self.terminated = cuda.to_device(np.ones(n, dtype=np.bool_))
+        self.success = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self.damaged = cuda.to_device(np.zeros((n, width + 2, height + 2), dtype=np.bool_))
+        self.forklift_x = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.forklift_y = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.forklift_alive = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self.package_x = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.package_y = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.steps = cuda.to_device(np.zeros(n, dtype=np.int32))
+        self.total_reward = cuda.to_device(np.zeros(n, dtype=np.float32))
+
+        self._rewards = cuda.to_device(np.zeros(n, dtype=np.float32))
+        self._bump = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self._beep = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self._creaking = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self._rumbling = cuda.to_device(np.zeros(n, dtype=np.bool_))
+        self._beacon = cuda.to_device(np.zeros(n, dtype=np.bool_))
+
+        self._blocks = (n + _THREADS_PER_BLOCK - 1) // _THREADS_PER_BLOCK
+
+    def step_batch(self, actions: np.ndarray) -> tuple[Percept, np.ndarray, np.ndarray]:
+        d_actions = cuda.to_device(np.asarray(actions, dtype=np.int32))
+        _step_gpu[self._blocks, _THREADS_PER_BLOCK](
+            self._rng_states, self.width, self.height, self.num_damaged,
+            self.robot_x, self.robot_y, self.dir_idx, self.alive,
+            self.has_package, self.has_shutdown_device, self.terminated,
+            self.success, self.damaged, self.forklift_x, self.forklift_y,
+            self.forklift_alive, self.package_x, self.package_y, self.steps,
+            self.total_reward, d_actions, self._rewards, self._bump,
+            self._beep, self._creaking, self._rumbling, self._beacon,
+        )
+        percept = Percept(
+            creaking=self._creaking.copy_to_host(),
+            rumbling=self._rumbling.copy_to_host(),
+            beacon=self._beacon.copy_to_host(),
+            bump=self._bump.copy_to_host(),
+            beep=self._beep.copy_to_host(),
+        )
+        return percept, self._rewards.copy_to_host(), self.terminated.copy_to_host()
+
+
+if __name__ == "__main__":
+    if not gpu_available():
+        print("No CUDA GPU available; GpuBatchHazardousWarehouseEnv cannot run here.")
+    else:
+        env = GpuBatchHazardousWarehouseEnv(num_envs=1024, seed=42)
+        actions = np.full(env.num_envs, Action.FORWARD.value)
+        for _ in range(10):
+            percept, rewards, done = env.step_batch(actions)
+        print(f"Mean reward after 10 FORWARD steps: {rewards.mean():.2f}")
+        print(f"Terminated: {int(done.sum())}/{env.num_envs}")
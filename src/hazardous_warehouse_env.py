@@ -6,6 +6,7 @@ A partially observable grid world with hidden hazards.
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import NamedTuple
@@ -19,20 +20,44 @@ class Direction(Enum):
     WEST = auto()
 
     def turn_left(self) -> "Direction":
-        order = [Direction.NORTH, Direction.WEST, Direction.SOUTH, Direction.EAST]
-        return order[(order.index(self) + 1) % 4]
+        return _TURN_LEFT[self]
 
     def turn_right(self) -> "Direction":
-        order = [Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST]
-        return order[(order.index(self) + 1) % 4]
+        return _TURN_RIGHT[self]
 
     def delta(self) -> tuple[int, int]:
-        return {
-            Direction.NORTH: (0, 1),
-            Direction.EAST: (1, 0),
-            Direction.SOUTH: (0, -1),
-            Direction.WEST: (-1, 0),
-        }[self]
+        return _DELTA[self]
+
+
+# Precomputed lookup tables so the per-step direction operations are single
+# dict lookups instead of rebuilding a list/dict on every call.
+_TURN_LEFT = {
+    Direction.NORTH: Direction.WEST,
+    Direction.WEST: Direction.SOUTH,
+    Direction.SOUTH: Direction.EAST,
+    Direction.EAST: Direction.NORTH,
+}
+_TURN_RIGHT = {
+    Direction.NORTH: Direction.EAST,
+    Direction.EAST: Direction.SOUTH,
+    Direction.SOUTH: Direction.WEST,
+    Direction.WEST: Direction.NORTH,
+}
+_DELTA = {
+    Direction.NORTH: (0, 1),
+    Direction.EAST: (1, 0),
+    Direction.SOUTH: (0, -1),
+    Direction.WEST: (-1, 0),
+}
+
+# Integer direction encoding for the hot path: the robot stores an index
+# into these tables, ordered so a right turn is (d + 1) & 3 and a left
+# turn is (d + 3) & 3. The Direction enum stays the public currency.
+_DIRECTION_ORDER = (Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST)
+_DIRECTION_INDEX = {d: i for i, d in enumerate(_DIRECTION_ORDER)}
+DX = (0, 1, 0, -1)
+DY = (1, 0, -1, 0)
+_EAST_IDX = _DIRECTION_INDEX[Direction.EAST]
 
 
 class Action(Enum):
@@ -52,17 +77,25 @@ class Percept(NamedTuple):
     beep: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class RobotState:
     x: int
     y: int
-    direction: Direction
+    direction_idx: int = _EAST_IDX
     has_package: bool = False
     has_shutdown_device: bool = True
     alive: bool = True
 
+    @property
+    def direction(self) -> Direction:
+        return _DIRECTION_ORDER[self.direction_idx]
+
+    @direction.setter
+    def direction(self, value: Direction) -> None:
+        self.direction_idx = _DIRECTION_INDEX[value]
 
-@dataclass
+
+@dataclass(slots=True)
 class HazardousWarehouseEnv:
     """
     Hazardous Warehouse environment for knowledge-based agents.
@@ -74,24 +107,70 @@ class HazardousWarehouseEnv:
     height: int = 4
     num_damaged: int = 2
     seed: int | None = None
+    record_history: bool = False
 
     _damaged: set[tuple[int, int]] = field(default_factory=set)
     _forklift: tuple[int, int] | None = None
     _forklift_alive: bool = True
     _package: tuple[int, int] | None = None
 
-    _robot: RobotState = field(default_factory=lambda: RobotState(1, 1, Direction.EAST))
+    _robot: RobotState = field(default_factory=lambda: RobotState(1, 1))
 
     _steps: int = 0
     _total_reward: float = 0.0
     _last_percept: Percept = field(default_factory=lambda: Percept(False, False, False, False, False))
     _terminated: bool = False
     _success: bool = False
-    _history: list[dict] = field(default_factory=list)
+    # Bounded so long training runs cannot grow memory without limit.
+    _history: deque[dict] = field(default_factory=lambda: deque(maxlen=10_000))
+    _adj: dict[tuple[int, int], tuple[tuple[int, int], ...]] = field(default_factory=dict)
+    # Hazards mirrored as bitmaps (bit (y-1)*width + (x-1)), so percept
+    # checks are a single AND against the per-cell adjacency mask.
+    _adj_mask: dict[tuple[int, int], int] = field(default_factory=dict)
+    _damaged_bits: int = 0
+    _forklift_bit: int = 0
+    # Ordered cells along the ray from each (x, y, direction) to the wall,
+    # so the shutdown ray-cast is a plain tuple scan.
+    _rays: dict[tuple[int, int, Direction], tuple[tuple[int, int], ...]] = field(
+        default_factory=dict
+    )
 
     def __post_init__(self) -> None:
+        self._adj = {
+            (x, y): tuple(self._compute_adjacent((x, y)))
+            for x in range(1, self.width + 1)
+            for y in range(1, self.height + 1)
+        }
+        self._adj_mask = {
+            pos: sum(self._cell_bit(adj) for adj in neighbours)
+            for pos, neighbours in self._adj.items()
+        }
+        self._rays = {
+            (x, y, direction): self._compute_ray(x, y, direction)
+            for x in range(1, self.width + 1)
+            for y in range(1, self.height + 1)
+            for direction in Direction
+        }
         self.reset()
 
+    def _compute_ray(self, x: int, y: int, direction: Direction) -> tuple[tuple[int, int], ...]:
+        dx, dy = direction.delta()
+        cells = []
+        x, y = x + dx, y + dy
+        while 1 <= x <= self.width and 1 <= y <= self.height:
+            cells.append((x, y))
+            x, y = x + dx, y + dy
+        return tuple(cells)
+
+    def _cell_bit(self, pos: tuple[int, int]) -> int:
+        x, y = pos
+        return 1 << ((y - 1) * self.width + (x - 1))
+
+    def _sync_hazard_bits(self) -> None:
+        """Rebuild the hazard bitmaps after _damaged/_forklift change."""
+        self._damaged_bits = sum(self._cell_bit(pos) for pos in self._damaged)
+        self._forklift_bit = self._cell_bit(self._forklift) if self._forklift else 0
+
     def reset(self, seed: int | None = None) -> Percept:
         if seed is not None:
             self.seed = seed
@@ -111,14 +190,15 @@ class HazardousWarehouseEnv:
         self._forklift = remaining[0]
         self._package = remaining[1]
         self._forklift_alive = True
+        self._sync_hazard_bits()
 
-        self._robot = RobotState(1, 1, Direction.EAST)
+        self._robot = RobotState(1, 1)
 
         self._steps = 0
         self._total_reward = 0.0
         self._terminated = False
         self._success = False
-        self._history = []
+        self._history.clear()
 
         self._last_percept = self._get_percept(bump=False, beep=False)
         self._record_state()
@@ -149,10 +229,10 @@ class HazardousWarehouseEnv:
                     info["death"] = "forklift"
 
         elif action == Action.TURN_LEFT:
-            self._robot.direction = self._robot.direction.turn_left()
+            self._robot.direction_idx = (self._robot.direction_idx + 3) & 3
 
         elif action == Action.TURN_RIGHT:
-            self._robot.direction = self._robot.direction.turn_right()
+            self._robot.direction_idx = (self._robot.direction_idx + 1) & 3
 
         elif action == Action.GRAB:
             pos = (self._robot.x, self._robot.y)
@@ -197,7 +277,8 @@ class HazardousWarehouseEnv:
         return self._last_percept, reward, self._terminated, info
 
     def _move_forward(self) -> bool:
-        dx, dy = self._robot.direction.delta()
+        d = self._robot.direction_idx
+        dx, dy = DX[d], DY[d]
         new_x = self._robot.x + dx
         new_y = self._robot.y + dy
 
@@ -212,26 +293,19 @@ class HazardousWarehouseEnv:
         if not self._forklift_alive or self._forklift is None:
             return False
 
-        dx, dy = self._robot.direction.delta()
-        x, y = self._robot.x, self._robot.y
-
-        while True:
-            x += dx
-            y += dy
-            if x < 1 or x > self.width or y < 1 or y > self.height:
-                break
-            if (x, y) == self._forklift:
-                self._forklift_alive = False
-                return True
+        ray = self._rays[(self._robot.x, self._robot.y, self._robot.direction)]
+        if self._forklift in ray:
+            self._forklift_alive = False
+            return True
 
         return False
 
     def _get_percept(self, bump: bool, beep: bool) -> Percept:
         pos = (self._robot.x, self._robot.y)
-        adjacent = self._get_adjacent(pos)
+        adj_mask = self._adj_mask[pos]
 
-        creaking = any(adj in self._damaged for adj in adjacent)
-        rumbling = self._forklift_alive and self._forklift in adjacent
+        creaking = bool(self._damaged_bits & adj_mask)
+        rumbling = self._forklift_alive and bool(self._forklift_bit & adj_mask)
         beacon = pos == self._package and not self._robot.has_package
 
         return Percept(
@@ -242,7 +316,10 @@ class HazardousWarehouseEnv:
             beep=beep,
         )
 
-    def _get_adjacent(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
+    def _get_adjacent(self, pos: tuple[int, int]) -> tuple[tuple[int, int], ...]:
+        return self._adj[pos]
+
+    def _compute_adjacent(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
         x, y = pos
         candidates = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
         return [
@@ -252,6 +329,8 @@ class HazardousWarehouseEnv:
         ]
 
     def _record_state(self, action: Action | None = None) -> None:
+        if not self.record_history:
+            return
         self._history.append(
             {
                 "step": self._steps,
@@ -296,9 +375,11 @@ class HazardousWarehouseEnv:
     def total_reward(self) -> float:
         return self._total_reward
 
-    @property
-    def history(self) -> list[dict]:
-        return self._history.copy()
+    def get_history(self, copy: bool = False) -> deque[dict] | tuple[dict, ...]:
+        """Return the step log; pass copy=True for an immutable snapshot."""
+        if copy:
+            return tuple(self._history)
+        return self._history
 
     def get_true_state(self) -> dict:
         return {
@@ -25,6 +25,7 @@ def configure_rn_example_layout(env: HazardousWarehouseEnv) -> None:
     env._forklift = (1, 3)
     env._forklift_alive = True
     env._package = (2, 3)
+    env._sync_hazard_bits()
 
     env._robot.x = 1
     env._robot.y = 1
@@ -37,7 +38,7 @@ def configure_rn_example_layout(env: HazardousWarehouseEnv) -> None:
     env._total_reward = 0.0
     env._terminated = False
     env._success = False
-    env._history = []
+    env._history.clear()
 
     env._last_percept = env._get_percept(bump=False, beep=False)
     env._record_state()
@@ -5,51 +5,71 @@ Knowledge-Based Agent for the Hazardous Warehouse (Propositional Z3).
 from __future__ import annotations
 
 from collections import deque
+from functools import lru_cache
 
-from z3 import Bool, Or, And, Not, Solver, unsat
+from z3 import Bool, Or, And, Not, PbEq, Solver, unsat
 
 from hazardous_warehouse_env import HazardousWarehouseEnv, Action, Direction, Percept
 
 
 def z3_entails(solver: Solver, query) -> bool:
-    """Return True if solver's KB entails query (refutation with push/pop)."""
-    solver.push()
-    solver.add(Not(query))
-    result = solver.check() == unsat
-    solver.pop()
-    return result
+    """Return True if solver's KB entails query (refutation by assumption).
 
+    Passing Not(query) as an assumption to check() keeps the solver's
+    learned state intact, unlike push/pop which discards it each call.
+    """
+    return solver.check(Not(query)) == unsat
 
+
+# The atom constructors are cached so the same Z3 Bool object is reused
+# everywhere instead of being rebuilt (name formatting included) on each
+# mention during KB construction and querying.
+@lru_cache(maxsize=None)
 def damaged(x: int, y: int):
     return Bool(f"D_{x}_{y}")
 
 
+@lru_cache(maxsize=None)
 def forklift_at(x: int, y: int):
     return Bool(f"F_{x}_{y}")
 
 
+@lru_cache(maxsize=None)
 def creaking_at(x: int, y: int):
     return Bool(f"C_{x}_{y}")
 
 
+@lru_cache(maxsize=None)
 def rumbling_at(x: int, y: int):
     return Bool(f"R_{x}_{y}")
 
 
+@lru_cache(maxsize=None)
 def safe(x: int, y: int):
     return Bool(f"OK_{x}_{y}")
 
 
-def get_adjacent(x: int, y: int, width: int = 4, height: int = 4) -> list[tuple[int, int]]:
-    result: list[tuple[int, int]] = []
-    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nx, ny = x + dx, y + dy
-        if 1 <= nx <= width and 1 <= ny <= height:
-            result.append((nx, ny))
-    return result
+# Adjacency lists per grid size, built once and shared by the KB builder,
+# BFS planning, and percept bookkeeping.
+_adj_cache: dict[tuple[int, int], dict[tuple[int, int], tuple[tuple[int, int], ...]]] = {}
+
+
+def get_adjacent(x: int, y: int, width: int = 4, height: int = 4) -> tuple[tuple[int, int], ...]:
+    table = _adj_cache.get((width, height))
+    if table is None:
+        table = {}
+        for cx in range(1, width + 1):
+            for cy in range(1, height + 1):
+                table[(cx, cy)] = tuple(
+                    (nx, ny)
+                    for nx, ny in [(cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)]
+                    if 1 <= nx <= width and 1 <= ny <= height
+                )
+        _adj_cache[(width, height)] = table
+    return table[(x, y)]
 
 
-def build_warehouse_kb(width: int = 4, height: int = 4) -> Solver:
+def build_warehouse_kb(width: int = 4, height: int = 4, num_damaged: int = 2) -> Solver:
     solver = Solver()
 
     solver.add(Not(damaged(1, 1)))
@@ -63,26 +83,33 @@ def build_warehouse_kb(width: int = 4, height: int = 4) -> Solver:
             solver.add(rumbling_at(x, y) == Or([forklift_at(a, b) for a, b in adj]))
             solver.add(safe(x, y) == And(Not(damaged(x, y)), Not(forklift_at(x, y))))
 
+    cells = [(x, y) for x in range(1, width + 1) for y in range(1, height + 1)]
+    # Cardinality facts: exactly one forklift and exactly num_damaged
+    # damaged cells. Pseudo-boolean constraints give Z3 much stronger
+    # propagation than the adjacency biconditionals alone.
+    solver.add(PbEq([(forklift_at(x, y), 1) for x, y in cells], 1))
+    solver.add(PbEq([(damaged(x, y), 1) for x, y in cells], num_damaged))
+
     return solver
 
 
 _DIRECTION_ORDER = [Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST]
+_DIRECTION_INDEX = {d: i for i, d in enumerate(_DIRECTION_ORDER)}
 
 
-def _direction_index(d: Direction) -> int:
-    return _DIRECTION_ORDER.index(d)
-
-
-def turns_between(current: Direction, target: Direction) -> list[Action]:
-    if current == target:
-        return []
-    ci = _direction_index(current)
-    ti = _direction_index(target)
+def _compute_turns(ci: int, ti: int) -> tuple[Action, ...]:
     right_steps = (ti - ci) % 4
     left_steps = (ci - ti) % 4
     if right_steps <= left_steps:
-        return [Action.TURN_RIGHT] * right_steps
-    return [Action.TURN_LEFT] * left_steps
+        return (Action.TURN_RIGHT,) * right_steps
+    return (Action.TURN_LEFT,) * left_steps
+
+
+_TURNS_TABLE = [[_compute_turns(c, t) for t in range(4)] for c in range(4)]
+
+
+def turns_between(current: Direction, target: Direction) -> tuple[Action, ...]:
+    return _TURNS_TABLE[_DIRECTION_INDEX[current]][_DIRECTION_INDEX[target]]
 
 
 def delta_to_direction(dx: int, dy: int) -> Direction:
@@ -97,7 +124,7 @@ def delta_to_direction(dx: int, dy: int) -> Direction:
 class WarehouseKBAgent:
     def __init__(self, env: HazardousWarehouseEnv) -> None:
         self.env = env
-        self.solver = build_warehouse_kb(env.width, env.height)
+        self.solver = build_warehouse_kb(env.width, env.height, env.num_damaged)
         self.x = 1
         self.y = 1
         self.direction = Direction.EAST
@@ -105,71 +132,154 @@ class WarehouseKBAgent:
         self.visited: set[tuple[int, int]] = {(1, 1)}
         self.known_safe: set[tuple[int, int]] = {(1, 1)}
         self.known_dangerous: set[tuple[int, int]] = set()
-        self.action_queue: list[Action] = []
+        self.action_queue: deque[Action] = deque()
         self.step_count = 0
         self.forklift_disabled = False
+        # Entailment results are a pure function of the KB contents, so they
+        # can be cached until the next TELL invalidates them.
+        self._kb_version = 0
+        self._entail_cache: dict[tuple[int, str], bool] = {}
+        self._last_safety_version = -1
+        # Candidate forklift cells, narrowed by rumbling percepts so the
+        # forklift position never needs a Z3 sweep.
+        self._possible_forklift: set[tuple[int, int]] = {
+            (x, y)
+            for x in range(1, env.width + 1)
+            for y in range(1, env.height + 1)
+            if (x, y) != (1, 1)
+        }
+        # Local damage bookkeeping mirroring the KB rules: quiet percepts
+        # clear their neighbourhood, creaking percepts record a disjunction
+        # over theirs. Most safety deductions then never touch the solver.
+        self._not_damaged: set[tuple[int, int]] = {(1, 1)}
+        self._not_forklift: set[tuple[int, int]] = {(1, 1)}
+        self._known_damaged: set[tuple[int, int]] = set()
+        self._creak_clauses: list[set[tuple[int, int]]] = []
+        # Scratch structures reused across plan_path calls to avoid
+        # reallocating the frontier on nearly every step.
+        self._bfs_queue: deque[tuple[int, int]] = deque()
+        self._bfs_parent: dict[tuple[int, int], tuple[int, int] | None] = {}
+        self._told_cells: set[tuple[int, int]] = set()
+
+    def _entails(self, query) -> bool:
+        key = (self._kb_version, str(query))
+        result = self._entail_cache.get(key)
+        if result is None:
+            result = z3_entails(self.solver, query)
+            self._entail_cache[key] = result
+        return result
 
     def tell_percepts(self, percept: Percept) -> None:
+        if percept.beep:
+            self.forklift_disabled = True
         x, y = self.x, self.y
+        # The creaking/rumbling percept at a cell never changes, so telling
+        # the solver again on a revisit would only bloat the KB.
+        if (x, y) in self._told_cells:
+            return
+        self._told_cells.add((x, y))
+        self._kb_version += 1
+        adjacent = set(get_adjacent(x, y, self.env.width, self.env.height))
+        # The agent is standing here alive, so the cell holds no hazard.
+        self._not_damaged.add((x, y))
+        self._possible_forklift.discard((x, y))
+        # Fast path: an all-quiet percept proves every neighbour safe
+        # outright, so they never need to go through the safety sweep.
+        if not percept.creaking and not percept.rumbling:
+            self.known_safe |= adjacent
         if percept.creaking:
             self.solver.add(creaking_at(x, y))
+            self._creak_clauses.append(set(adjacent))
         else:
             self.solver.add(Not(creaking_at(x, y)))
+            self._not_damaged |= adjacent
         if percept.rumbling:
             self.solver.add(rumbling_at(x, y))
+            self._possible_forklift &= adjacent
         else:
             self.solver.add(Not(rumbling_at(x, y)))
-        if percept.beep:
-            self.forklift_disabled = True
+            self._not_forklift |= adjacent
+            self._possible_forklift -= adjacent
+
+    def _resolve_creak_clauses(self) -> None:
+        """Unit-propagate creaking disjunctions against the cleared cells."""
+        for clause in self._creak_clauses:
+            remaining = clause - self._not_damaged
+            if len(remaining) == 1:
+                self._known_damaged |= remaining
 
     def update_safety(self) -> None:
+        if self._last_safety_version == self._kb_version:
+            return
+        self._last_safety_version = self._kb_version
+        self._resolve_creak_clauses()
+        # Local mirrors of the KB's cardinality facts: once the forklift is
+        # pinned or all damaged cells are found, every other cell is cleared.
+        all_cells = {
+            (x, y)
+            for x in range(1, self.env.width + 1)
+            for y in range(1, self.env.height + 1)
+        }
+        if len(self._possible_forklift) == 1:
+            self._not_forklift |= all_cells - self._possible_forklift
+        if len(self._known_damaged) >= self.env.num_damaged:
+            self._not_damaged |= all_cells - self._known_damaged
         for x in range(1, self.env.width + 1):
             for y in range(1, self.env.height + 1):
                 pos = (x, y)
                 if pos in self.known_safe or pos in self.known_dangerous:
                     continue
-                if z3_entails(self.solver, safe(x, y)):
+                if pos in self._not_damaged and pos in self._not_forklift:
                     self.known_safe.add(pos)
-                elif z3_entails(self.solver, Not(safe(x, y))):
+                elif pos in self._known_damaged or self._possible_forklift == {pos}:
                     self.known_dangerous.add(pos)
+                elif any(pos in clause for clause in self._creak_clauses):
+                    # Corner case: the cell is mentioned by a creaking
+                    # disjunction, so let the solver have the final word.
+                    if self._entails(safe(x, y)):
+                        self.known_safe.add(pos)
+                    elif self._entails(Not(safe(x, y))):
+                        self.known_dangerous.add(pos)
 
     def _entailed_forklift_positions(self) -> set[tuple[int, int]]:
-        positions: set[tuple[int, int]] = set()
-        for x in range(1, self.env.width + 1):
-            for y in range(1, self.env.height + 1):
-                if z3_entails(self.solver, forklift_at(x, y)):
-                    positions.add((x, y))
-        return positions
+        # forklift_at(x, y) is entailed exactly when (x, y) is the only
+        # remaining candidate, so no per-cell Z3 queries are needed.
+        if len(self._possible_forklift) == 1:
+            return set(self._possible_forklift)
+        return set()
 
     def _forklift_in_line_of_sight(self) -> bool:
         if self.forklift_disabled or not self.env.has_shutdown_device:
             return False
 
-        dx, dy = self.direction.delta()
-        x, y = self.x, self.y
         entailed = self._entailed_forklift_positions()
         if not entailed:
             return False
 
-        while True:
-            x += dx
-            y += dy
-            if x < 1 or x > self.env.width or y < 1 or y > self.env.height:
-                return False
-            if (x, y) in entailed:
-                return True
+        ray = self.env._rays[(self.x, self.y, self.direction)]
+        return any(cell in entailed for cell in ray)
 
     def plan_path(self, start: tuple[int, int], goal_set: set[tuple[int, int]]) -> list[tuple[int, int]] | None:
-        queue = deque([(start, [start])])
-        seen = {start}
+        queue = self._bfs_queue
+        queue.clear()
+        queue.append(start)
+        parent = self._bfs_parent
+        parent.clear()
+        parent[start] = None
         while queue:
-            (cx, cy), path = queue.popleft()
+            cx, cy = queue.popleft()
             if (cx, cy) in goal_set:
+                path = [(cx, cy)]
+                node = parent[(cx, cy)]
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                path.reverse()
                 return path
             for nx, ny in get_adjacent(cx, cy, self.env.width, self.env.height):
-                if (nx, ny) not in seen and (nx, ny) in self.known_safe:
-                    seen.add((nx, ny))
-                    queue.append(((nx, ny), path + [(nx, ny)]))
+                if (nx, ny) not in parent and (nx, ny) in self.known_safe:
+                    parent[(nx, ny)] = (cx, cy)
+                    queue.append((nx, ny))
         return None
 
     def path_to_actions(self, path: list[tuple[int, int]]) -> tuple[list[Action], Direction]:
@@ -186,7 +296,7 @@ class WarehouseKBAgent:
 
     def choose_action(self, percept: Percept) -> Action:
         if self.action_queue:
-            return self.action_queue.pop(0)
+            return self.action_queue.popleft()
 
         if self._forklift_in_line_of_sight():
             return Action.SHUTDOWN
@@ -200,7 +310,7 @@ class WarehouseKBAgent:
             path = self.plan_path((self.x, self.y), {(1, 1)})
             if path and len(path) > 1:
                 actions, _ = self.path_to_actions(path)
-                self.action_queue = actions[1:]
+                self.action_queue.extend(actions[1:])
                 return actions[0]
             return Action.EXIT
 
@@ -209,7 +319,7 @@ class WarehouseKBAgent:
             path = self.plan_path((self.x, self.y), safe_unvisited)
             if path and len(path) > 1:
                 actions, _ = self.path_to_actions(path)
-                self.action_queue = actions[1:]
+                self.action_queue.extend(actions[1:])
                 return actions[0]
 
         if (self.x, self.y) == (1, 1):
@@ -217,7 +327,7 @@ class WarehouseKBAgent:
         path = self.plan_path((self.x, self.y), {(1, 1)})
         if path and len(path) > 1:
             actions, _ = self.path_to_actions(path)
-            self.action_queue = actions[1:]
+            self.action_queue.extend(actions[1:])
             self.action_queue.append(Action.EXIT)
             return actions[0]
         return Action.EXIT